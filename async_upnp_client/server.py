@@ -4,14 +4,17 @@
 # pylint: disable=too-many-lines
 
 import asyncio
+import gzip
+import hashlib
 import logging
 import socket
 import sys
 import time
+import weakref
 import xml.etree.ElementTree as ET
 from asyncio.transports import DatagramTransport
 from datetime import datetime, timedelta, timezone
-from functools import partial, wraps
+from functools import partial
 from itertools import cycle
 from random import randrange
 from time import mktime
@@ -21,6 +24,7 @@ from typing import (
     Dict,
     List,
     Mapping,
+    MutableMapping,
     Optional,
     Sequence,
     Tuple,
@@ -31,6 +35,7 @@ from typing import (
 from urllib.parse import urlparse
 from uuid import uuid4
 from wsgiref.handlers import format_date_time
+from xml.sax.saxutils import escape
 
 import defusedxml.ElementTree as DET  # pylint: disable=import-error
 import voluptuous as vol
@@ -90,8 +95,25 @@ NAMESPACES = {
     "s": "http://schemas.xmlsoap.org/soap/envelope/",
     "es": "http://schemas.xmlsoap.org/soap/encoding/",
 }
+_SOAP_BODY_TAG = f"{{{NAMESPACES['s']}}}Body"
+_SOAP_ENVELOPE_START = (
+    f'<s:Envelope xmlns:s="{NAMESPACES["s"]}" s:encodingStyle="{NAMESPACES["es"]}">'
+    "<s:Body>"
+)
+_SOAP_ENVELOPE_END = "</s:Body></s:Envelope>"
+_SOAP_FAULT_START = (
+    f"{_SOAP_ENVELOPE_START}<s:Fault><faultcode>s:Client</faultcode>"
+    "<faultstring>UPnPError</faultstring><detail>"
+    '<UPnPError xmlns="urn:schemas-upnp-org:control-1-0"><errorCode>'
+).encode()
+_SOAP_FAULT_END = (
+    "</errorCode><errorDescription>Action Failed</errorDescription></UPnPError>"
+    f"</detail></s:Fault>{_SOAP_ENVELOPE_END}"
+).encode()
 HEADER_SERVER = f"async-upnp-client/{version} UPnP/2.0 Server/1.0"
 HEADER_CACHE_CONTROL = "max-age=1800"
+_XML_CONTENT_TYPE = "text/xml; charset=utf-8"
+_XML_HEADERS = {"CONTENT-TYPE": _XML_CONTENT_TYPE}
 SSDP_SEARCH_RESPONDER_OPTIONS = "ssdp_search_responder_options"
 SSDP_SEARCH_RESPONDER_OPTION_ALWAYS_REPLY_WITH_ROOT_DEVICE = (
     "ssdp_search_responder_always_rootdevice"
@@ -99,6 +121,12 @@ SSDP_SEARCH_RESPONDER_OPTION_ALWAYS_REPLY_WITH_ROOT_DEVICE = (
 SSDP_SEARCH_RESPONDER_OPTION_HEADERS = "search_headers"
 SSDP_ADVERTISEMENT_ANNOUNCER_OPTIONS = "ssdp_advertisement_announcer_options"
 SSDP_ADVERTISEMENT_ANNOUNCER_OPTION_HEADERS = "advertisement_headers"
+SSDP_SOCKET_SEND_BUFFER_SIZE = 256 * 1024
+SSDP_SOCKET_RECEIVE_BUFFER_SIZE = 64 * 1024
+
+# Placeholder for the xml-field of the info-tuples of server side
+# actions/arguments/state variables. Shared, it is never read or modified.
+_PLACEHOLDER_XML = ET.Element("server_placeholder")
 
 _LOGGER = logging.getLogger(__name__)
 _LOGGER_TRAFFIC_UPNP = logging.getLogger("async_upnp_client.traffic.upnp")
@@ -232,6 +260,19 @@ class UpnpServerService(UpnpService):
 
     SERVICE_DEFINITION: ServiceInfo
     STATE_VARIABLE_DEFINITIONS: Mapping[str, StateVariableTypeInfo]
+    _ACTION_METHODS: Tuple[str, ...] = ()
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        """Collect the names of the annotated action methods, once per class."""
+        super().__init_subclass__(**kwargs)
+        # Walk the whole MRO so actions from mixins and every base are included.
+        # Which definition is used is resolved on the instance, see _init_actions.
+        action_methods: Dict[str, None] = {}
+        for klass in reversed(cls.__mro__):
+            for name, value in vars(klass).items():
+                if hasattr(value, "__upnp_action__"):
+                    action_methods[name] = None
+        cls._ACTION_METHODS = tuple(action_methods)
 
     def __init__(self, requester: UpnpRequester) -> None:
         """Initialize."""
@@ -258,7 +299,7 @@ class UpnpServerService(UpnpService):
             name,
             send_events=False,
             type_info=type_info,
-            xml=ET.Element("stateVariable"),
+            xml=_PLACEHOLDER_XML,
         )
 
         # pylint: disable=protected-access
@@ -282,12 +323,10 @@ class UpnpServerService(UpnpService):
 
     def _init_actions(self) -> None:
         """Initialize actions from annotated methods."""
-        for item in dir(self):
-            if item in ("control_url", "event_sub_url", "scpd_url", "device"):
-                continue
-
-            thing = getattr(self, item, None)
-            if not thing or not hasattr(thing, "__upnp_action__"):
+        for item in self._ACTION_METHODS:
+            thing = getattr(self, item)
+            if not hasattr(thing, "__upnp_action__"):
+                # Overridden by a method which is not an action.
                 continue
 
             self._init_action(thing)
@@ -299,47 +338,41 @@ class UpnpServerService(UpnpService):
             getattr(func, "__upnp_action__"),
         )
 
+        state_variable = self.state_variable
+        annotations = func.__annotations__
         arg_infos: List[ActionArgumentInfo] = []
         args: List[UpnpAction.Argument] = []
         for arg_name, state_var_name in in_args.items():
-            # Validate function has parameter.
-            assert arg_name in func.__annotations__
-
-            # Validate parameter type.
-            annotation = func.__annotations__.get(arg_name, None)
-            state_var = self.state_variable(state_var_name)
-            assert state_var.data_type_mapping["type"] == annotation
+            # Validate function has parameter, of the right type.
+            state_var = state_variable(state_var_name)
+            assert state_var.data_type_mapping["type"] == annotations.get(arg_name)
 
             # Build in-argument.
             arg_info = ActionArgumentInfo(
                 arg_name,
                 direction="in",
                 state_variable_name=state_var.name,
-                xml=ET.Element("server_argument"),
+                xml=_PLACEHOLDER_XML,
             )
             arg_infos.append(arg_info)
-
-            arg = UpnpAction.Argument(arg_info, state_var)
-            args.append(arg)
+            args.append(UpnpAction.Argument(arg_info, state_var))
 
         for arg_name, state_var_name in out_args.items():
             # Build out-argument.
-            state_var = self.state_variable(state_var_name)
+            state_var = state_variable(state_var_name)
             arg_info = ActionArgumentInfo(
                 arg_name,
                 direction="out",
                 state_variable_name=state_var.name,
-                xml=ET.Element("server_argument"),
+                xml=_PLACEHOLDER_XML,
             )
             arg_infos.append(arg_info)
-
-            arg = UpnpAction.Argument(arg_info, state_var)
-            args.append(arg)
+            args.append(UpnpAction.Argument(arg_info, state_var))
 
         action_info = ActionInfo(
             name=name,
             arguments=arg_infos,
-            xml=ET.Element("server_action"),
+            xml=_PLACEHOLDER_XML,
         )
         action = UpnpServerAction(action_info, args)
         action.async_handle = func  # type: ignore
@@ -431,8 +464,10 @@ class UpnpServerDevice(UpnpDevice):
         config_id: int = 1,
     ) -> None:
         """Initialize."""
-        services = [service_type(requester=requester) for service_type in self.SERVICES]
-        embedded_devices = [
+        services = tuple(
+            service_type(requester=requester) for service_type in self.SERVICES
+        )
+        embedded_devices = tuple(
             device_type(
                 requester=requester,
                 base_uri=base_uri,
@@ -440,7 +475,7 @@ class UpnpServerDevice(UpnpDevice):
                 config_id=config_id,
             )
             for device_type in self.EMBEDDED_DEVICES
-        ]
+        )
         super().__init__(
             requester=requester,
             device_info=self.DEVICE_DEFINITION,
@@ -452,10 +487,53 @@ class UpnpServerDevice(UpnpDevice):
         self.boot_id = boot_id
         self.config_id = config_id
 
+        # The device tree is fixed after construction, walk it only once.
+        self._all_devices = super().all_devices
+        self._all_services = super().all_services
+
+    @property
+    def all_devices(self) -> List[UpnpDevice]:
+        """Get all devices, self and embedded. Do not modify the result."""
+        return self._all_devices
+
+    @property
+    def all_services(self) -> List[UpnpService]:
+        """Get all services, from self and embedded devices. Do not modify the result."""
+        return self._all_services
+
+
+def _set_socket_buffer_size(sock: socket.socket, option: int, size: int) -> None:
+    """Set the size of the send/receive buffer of a SSDP socket."""
+    # Done here and not in get_ssdp_socket, as only the server side needs
+    # to absorb M-SEARCH/response bursts. SO_REUSEPORT is already set there.
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, option, size)
+    except OSError as err:
+        _LOGGER.debug("Unable to set buffer size, socket: %s, error: %s", sock, err)
+
 
 class SsdpSearchResponder:
     """SSDP SEARCH responder."""
 
+    # pylint: disable=too-many-instance-attributes
+
+    __slots__ = (
+        "device",
+        "source",
+        "target",
+        "options",
+        "_transport",
+        "_response_socket",
+        "_loop",
+        "_response_packets",
+        "_devices_by_udn",
+        "_devices_by_type",
+        "_services_by_type",
+        "_location",
+        "_usn_rootdevice",
+        "_usns",
+    )
+
     def __init__(
         self,
         device: UpnpServerDevice,
@@ -472,6 +550,32 @@ class SsdpSearchResponder:
         self._response_socket: Optional[socket.socket] = None
         self._loop = asyncio.get_running_loop()
 
+        # Response packets, without the DATE header, per (ST, USN).
+        self._response_packets: Dict[Tuple[str, str], bytes] = {}
+
+        # Fixed LOCATION and USNs, the latter per device/service type.
+        self._location = f"{device.base_uri}{device.device_url}"
+        self._usn_rootdevice = f"{device.udn}::upnp:rootdevice"
+        self._usns: Dict[str, str] = {}
+
+        # Devices/services per lower cased search target.
+        self._devices_by_udn: Dict[str, List[UpnpDevice]] = {}
+        self._devices_by_type: Dict[str, List[UpnpDevice]] = {}
+        self._services_by_type: Dict[str, List[UpnpService]] = {}
+        for upnp_device in device.all_devices:
+            self._devices_by_udn.setdefault(upnp_device.udn.lower(), []).append(
+                upnp_device
+            )
+            for search_target in self._type_versions(upnp_device.device_type):
+                self._devices_by_type.setdefault(search_target, []).append(upnp_device)
+            self._usns[
+                upnp_device.device_type
+            ] = f"{device.udn}::{upnp_device.device_type}"
+        for service in device.all_services:
+            self._usns[service.service_type] = f"{device.udn}::{service.service_type}"
+            for search_target in self._type_versions(service.service_type):
+                self._services_by_type.setdefault(search_target, []).append(service)
+
     def _on_connect(self, transport: DatagramTransport) -> None:
         """Handle on connect."""
         self._transport = transport
@@ -559,16 +663,16 @@ class SsdpSearchResponder:
             )
         elif search_target == SSDP_ST_ROOTDEVICE:
             responses.append(self._build_response_rootdevice())
-        elif matched_devices := self.device.get_devices_matching_udn(search_target):
+        elif matched_devices := self._devices_by_udn.get(search_target):
             responses.extend(
                 self._build_responses_device_udn(device) for device in matched_devices
             )
-        elif matched_devices := self._matched_devices_by_type(search_target):
+        elif matched_devices := self._devices_by_type.get(search_target):
             responses.extend(
                 self._build_responses_device_type(device, search_target)
                 for device in matched_devices
             )
-        elif matched_services := self._matched_services_by_type(search_target):
+        elif matched_services := self._services_by_type.get(search_target):
             responses.extend(
                 self._build_responses_service(service, search_target)
                 for service in matched_services
@@ -577,40 +681,25 @@ class SsdpSearchResponder:
         if self.options.get(SSDP_SEARCH_RESPONDER_OPTION_ALWAYS_REPLY_WITH_ROOT_DEVICE):
             responses.append(self._build_response_rootdevice())
 
-        return responses
+        if not responses:
+            return responses
+
+        # DATE is the only header which changes, append it as the last header.
+        date_suffix = f"DATE:{format_date_time(time.time())}\r\n\r\n".encode()
+        return [response + date_suffix for response in responses]
 
     @staticmethod
-    def _match_type_versions(type_ver: str, search_target: str) -> bool:
-        """Determine if any service/device type up to the max version matches search_target."""
+    def _type_versions(type_ver: str) -> List[str]:
+        """Get the lower cased search targets matching a service/device type."""
         # As per 1.3.2 of the UPnP Device Architecture spec, all device service types
         # must respond to and be backwards-compatible with older versions of the same type
         type_ver_lower: str = type_ver.lower()
         try:
             base, max_ver = type_ver_lower.rsplit(":", 1)
             max_ver_i = int(max_ver)
-            for ver in range(max_ver_i + 1):
-                if f"{base}:{ver}" == search_target:
-                    return True
         except ValueError:
-            if type_ver_lower == search_target:
-                return True
-        return False
-
-    def _matched_devices_by_type(self, search_target: str) -> List[UpnpDevice]:
-        """Get matched devices by device type."""
-        return [
-            device
-            for device in self.device.all_devices
-            if self._match_type_versions(device.device_type, search_target)
-        ]
-
-    def _matched_services_by_type(self, search_target: str) -> List[UpnpService]:
-        """Get matched services by service type."""
-        return [
-            service
-            for service in self.device.all_services
-            if self._match_type_versions(service.service_type, search_target)
-        ]
+            return [type_ver_lower]
+        return [f"{base}:{ver}" for ver in range(max_ver_i + 1)]
 
     async def async_start(self) -> None:
         """Start."""
@@ -620,6 +709,9 @@ class SsdpSearchResponder:
         self._response_socket, _source, _target = get_ssdp_socket(
             self.source, self.target
         )
+        _set_socket_buffer_size(
+            self._response_socket, socket.SO_SNDBUF, SSDP_SOCKET_SEND_BUFFER_SIZE
+        )
 
         # Construct a socket for use with this pair of endpoints.
         sock, _source, _target = get_ssdp_socket(self.source, self.target)
@@ -628,9 +720,10 @@ class SsdpSearchResponder:
         address = ("", self.target[1])
         _LOGGER.debug("Binding socket, socket: %s, address: %s", sock, address)
         sock.bind(address)
+        _set_socket_buffer_size(sock, socket.SO_RCVBUF, SSDP_SOCKET_RECEIVE_BUFFER_SIZE)
 
         # Create protocol and send discovery packet.
-        loop = asyncio.get_event_loop()
+        loop = self._loop
         await loop.create_datagram_endpoint(
             lambda: SsdpProtocol(
                 loop,
@@ -649,13 +742,11 @@ class SsdpSearchResponder:
 
     def _build_response_rootdevice(self) -> bytes:
         """Send root device response."""
-        return self._build_response(
-            "upnp:rootdevice", f"{self.device.udn}::upnp:rootdevice"
-        )
+        return self._build_response(SSDP_ST_ROOTDEVICE, self._usn_rootdevice)
 
     def _build_responses_device_udn(self, device: UpnpDevice) -> bytes:
         """Send device responses for UDN."""
-        return self._build_response(device.udn, f"{self.device.udn}")
+        return self._build_response(device.udn, self.device.udn)
 
     def _build_responses_device_type(
         self, device: UpnpDevice, device_type: Optional[str] = None
@@ -663,7 +754,7 @@ class SsdpSearchResponder:
         """Send device responses for device type."""
         return self._build_response(
             device_type or device.device_type,
-            f"{self.device.udn}::{device.device_type}",
+            self._usns[device.device_type],
         )
 
     def _build_responses_service(
@@ -672,7 +763,7 @@ class SsdpSearchResponder:
         """Send service responses."""
         return self._build_response(
             service_type or service.service_type,
-            f"{self.device.udn}::{service.service_type}",
+            self._usns[service.service_type],
         )
 
     def _build_response(
@@ -680,21 +771,34 @@ class SsdpSearchResponder:
         service_type: str,
         unique_service_name: str,
     ) -> bytes:
-        """Send a response."""
-        return build_ssdp_packet(
+        """Get a response, without the DATE header and trailing CRLF."""
+        key = (service_type, unique_service_name)
+        packet = self._response_packets.get(key)
+        if packet is None:
+            packet = self._build_response_packet(service_type, unique_service_name)
+            self._response_packets[key] = packet
+        return packet
+
+    def _build_response_packet(
+        self,
+        service_type: str,
+        unique_service_name: str,
+    ) -> bytes:
+        """Build a response packet, without the DATE header and trailing CRLF."""
+        packet = build_ssdp_packet(
             "HTTP/1.1 200 OK",
             {
                 "CACHE-CONTROL": HEADER_CACHE_CONTROL,
-                "DATE": format_date_time(time.time()),
                 "SERVER": HEADER_SERVER,
                 "ST": service_type,
                 "USN": unique_service_name,
                 "EXT": "",
-                "LOCATION": f"{self.device.base_uri}{self.device.device_url}",
+                "LOCATION": self._location,
                 "BOOTID.UPNP.ORG": str(self.device.boot_id),
                 "CONFIGID.UPNP.ORG": str(self.device.config_id),
             },
         )
+        return packet[:-2]
 
     def _send_responses(self, remote_addr: str, responses: List[bytes]) -> None:
         """Send responses."""
@@ -705,20 +809,22 @@ class SsdpSearchResponder:
                 self._response_socket,
                 remote_addr,
             )
-        _LOGGER_TRAFFIC_SSDP.debug(
-            "Sending SSDP packets, target: %s, data: %s", remote_addr, responses
-        )
+        if _LOGGER_TRAFFIC_SSDP.isEnabledFor(logging.DEBUG):
+            _LOGGER_TRAFFIC_SSDP.debug(
+                "Sending SSDP packets, target: %s, data: %s", remote_addr, responses
+            )
         assert self._response_socket, "Socket not initialized"
+        sendto = self._response_socket.sendto
         for response in responses:
-            self._response_socket.sendto(response, remote_addr)
+            sendto(response, remote_addr)
 
 
-def _build_advertisements(
+def _build_advertisement_packets(
     target: AddressTupleVXType,
     root_device: UpnpServerDevice,
     nts: NotificationSubType = NotificationSubType.SSDP_ALIVE,
-) -> List[CaseInsensitiveDict]:
-    """Build advertisements to be sent for a UpnpDevice."""
+) -> List[Tuple[Dict[str, str], bytes]]:
+    """Build advertisement packets, with their headers, to be sent for a UpnpDevice."""
     # 3 + 2d + k (d: embedded device, k: service)
     # global:      ST: upnp:rootdevice
     #              USN: uuid:device-UUID::upnp:rootdevice
@@ -728,7 +834,7 @@ def _build_advertisements(
     #              USN: uuid:device-UUID::urn:schemas-upnp-org:device:deviceType:ver
     # per service: ST: urn:schemas-upnp-org:service:serviceType:ver
     #              USN: uuid:device-UUID::urn:schemas-upnp-org:service:serviceType:ver
-    advertisements: List[CaseInsensitiveDict] = []
+    advertisements: List[Dict[str, str]] = []
 
     host = (
         f"[{target[0]}]:{target[1]}"
@@ -747,7 +853,7 @@ def _build_advertisements(
 
     # root device
     advertisements.append(
-        CaseInsensitiveDict(
+        dict(
             base_headers,
             NT="upnp:rootdevice",
             USN=f"{root_device.udn}::upnp:rootdevice",
@@ -756,14 +862,14 @@ def _build_advertisements(
 
     for device in root_device.all_devices:
         advertisements.append(
-            CaseInsensitiveDict(
+            dict(
                 base_headers,
                 NT=f"{device.udn}",
                 USN=f"{device.udn}",
             )
         )
         advertisements.append(
-            CaseInsensitiveDict(
+            dict(
                 base_headers,
                 NT=f"{device.device_type}",
                 USN=f"{device.udn}::{device.device_type}",
@@ -772,14 +878,17 @@ def _build_advertisements(
 
     for service in root_device.all_services:
         advertisements.append(
-            CaseInsensitiveDict(
+            dict(
                 base_headers,
                 NT=f"{service.service_type}",
                 USN=f"{service.device.udn}::{service.service_type}",
             )
         )
 
-    return advertisements
+    start_line = "NOTIFY * HTTP/1.1"
+    return [
+        (headers, build_ssdp_packet(start_line, headers)) for headers in advertisements
+    ]
 
 
 class SsdpAdvertisementAnnouncer:
@@ -787,6 +896,17 @@ class SsdpAdvertisementAnnouncer:
 
     # pylint: disable=too-many-instance-attributes
 
+    __slots__ = (
+        "device",
+        "source",
+        "target",
+        "options",
+        "loop",
+        "_transport",
+        "_advertisements",
+        "_cancel_announce",
+    )
+
     ANNOUNCE_INTERVAL = timedelta(seconds=30)
 
     def __init__(
@@ -805,7 +925,7 @@ class SsdpAdvertisementAnnouncer:
         self.loop = loop or asyncio.get_event_loop()
 
         self._transport: Optional[DatagramTransport] = None
-        advertisements = _build_advertisements(self.target, device)
+        advertisements = _build_advertisement_packets(self.target, device)
         self._advertisements = cycle(advertisements)
         self._cancel_announce: Optional[asyncio.TimerHandle] = None
 
@@ -823,9 +943,10 @@ class SsdpAdvertisementAnnouncer:
             address = self.source
             _LOGGER.debug("Binding socket, socket: %s, address: %s", sock, address)
             sock.bind(address)
+        _set_socket_buffer_size(sock, socket.SO_SNDBUF, SSDP_SOCKET_SEND_BUFFER_SIZE)
 
         # Create protocol and send discovery packet.
-        loop = asyncio.get_event_loop()
+        loop = self.loop
         await loop.create_datagram_endpoint(
             lambda: SsdpProtocol(
                 loop,
@@ -862,10 +983,7 @@ class SsdpAdvertisementAnnouncer:
         protocol = cast(SsdpProtocol, self._transport.get_protocol())
         # Protocol can be None when it is not yet initialized.
         if protocol:
-            start_line = "NOTIFY * HTTP/1.1"
-            headers = next(self._advertisements)
-            packet = build_ssdp_packet(start_line, headers)
-
+            headers, packet = next(self._advertisements)
             _LOGGER.debug(
                 "Sending advertisement, NTS: %s, NT: %s, USN: %s",
                 headers["NTS"],
@@ -884,12 +1002,10 @@ class SsdpAdvertisementAnnouncer:
         """Send ssdp:byebye."""
         assert self._transport
 
-        start_line = "NOTIFY * HTTP/1.1"
-        advertisements = _build_advertisements(
+        advertisements = _build_advertisement_packets(
             self.target, self.device, NotificationSubType.SSDP_BYEBYE
         )
-        for headers in advertisements:
-            packet = build_ssdp_packet(start_line, headers)
+        for headers, packet in advertisements:
             protocol = cast(SsdpProtocol, self._transport.get_protocol())
             _LOGGER.debug(
                 "Sending advertisement, NTS: %s, NT: %s, USN: %s",
@@ -905,6 +1021,39 @@ class UpnpXmlSerializer:
 
     # pylint: disable=too-few-public-methods
 
+    # Server devices/services do not change after construction, cache their
+    # serialized descriptions. Keyed weakly to avoid keeping things alive.
+    _xml_cache: MutableMapping[
+        Union[UpnpDevice, UpnpService], Tuple[bytes, str, bytes]
+    ] = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def to_xml_bytes(cls, thing: Union[UpnpDevice, UpnpService]) -> bytes:
+        """Convert thing to serialized XML, cached."""
+        return cls.to_xml_bytes_etag(thing)[0]
+
+    @classmethod
+    def to_xml_bytes_etag(
+        cls, thing: Union[UpnpDevice, UpnpService], gzipped: bool = False
+    ) -> Tuple[bytes, str]:
+        """Convert thing to serialized XML, optionally gzipped, and its ETag (unquoted), cached."""
+        cached = cls._xml_cache.get(thing)
+        if cached is None:
+            thing_xml = ET.tostring(cls.to_xml(thing), encoding="utf-8")
+            etag = hashlib.sha256(thing_xml).hexdigest()[:32]
+            thing_xml_gzip = gzip.compress(thing_xml, compresslevel=6)
+            cached = cls._xml_cache[thing] = (thing_xml, etag, thing_xml_gzip)
+
+        thing_xml, etag, thing_xml_gzip = cached
+        if gzipped:
+            return thing_xml_gzip, f"{etag}-gzip"
+        return thing_xml, etag
+
+    @classmethod
+    def clear_cache(cls, thing: Union[UpnpDevice, UpnpService]) -> None:
+        """Remove the serialized XML of thing from the cache, if any."""
+        cls._xml_cache.pop(thing, None)
+
     @classmethod
     def to_xml(cls, thing: Union[UpnpDevice, UpnpService]) -> ET.Element:
         """Convert thing to XML."""
@@ -915,138 +1064,159 @@ class UpnpXmlSerializer:
 
         raise NotImplementedError()
 
+    @staticmethod
+    def _text_element(builder: ET.TreeBuilder, tag: str, text: Optional[str]) -> None:
+        """Add element with text, skipped if text is None."""
+        if text is None:
+            return
+
+        builder.start(tag, {})
+        builder.data(text)
+        builder.end(tag)
+
+    @classmethod
+    def _spec_version_to_xml(cls, builder: ET.TreeBuilder) -> None:
+        """Add specVersion element."""
+        builder.start("specVersion", {})
+        cls._text_element(builder, "major", "1")
+        cls._text_element(builder, "minor", "0")
+        builder.end("specVersion")
+
     @classmethod
     def _device_to_xml(cls, device: UpnpDevice) -> ET.Element:
         """Convert device to device description XML."""
-        root_el = ET.Element("root", xmlns="urn:schemas-upnp-org:device-1-0")
-        spec_version_el = ET.SubElement(root_el, "specVersion")
-        ET.SubElement(spec_version_el, "major").text = "1"
-        ET.SubElement(spec_version_el, "minor").text = "0"
-
-        device_el = cls._device_to_xml_bare(device)
-        root_el.append(device_el)
-
-        return root_el
+        builder = ET.TreeBuilder()
+        builder.start("root", {"xmlns": "urn:schemas-upnp-org:device-1-0"})
+        cls._spec_version_to_xml(builder)
+        cls._device_to_xml_bare(builder, device)
+        builder.end("root")
+        return builder.close()
 
     @classmethod
-    def _device_to_xml_bare(cls, device: UpnpDevice) -> ET.Element:
+    def _device_to_xml_bare(cls, builder: ET.TreeBuilder, device: UpnpDevice) -> None:
         """Convert device to XML, without the root-element."""
-        device_el = ET.Element("device", xmlns="urn:schemas-upnp-org:device-1-0")
-        ET.SubElement(device_el, "deviceType").text = device.device_type
-        ET.SubElement(device_el, "friendlyName").text = device.friendly_name
-        ET.SubElement(device_el, "manufacturer").text = device.manufacturer
-        ET.SubElement(device_el, "manufacturerURL").text = device.manufacturer_url
-        ET.SubElement(device_el, "modelDescription").text = device.model_description
-        ET.SubElement(device_el, "modelName").text = device.model_name
-        ET.SubElement(device_el, "modelNumber").text = device.model_number
-        ET.SubElement(device_el, "modelURL").text = device.model_url
-        ET.SubElement(device_el, "serialNumber").text = device.serial_number
-        ET.SubElement(device_el, "UDN").text = device.udn
-        ET.SubElement(device_el, "UPC").text = device.upc
-        ET.SubElement(device_el, "presentationURL").text = device.presentation_url
-
-        icon_list_el = ET.SubElement(device_el, "iconList")
+        text_element = cls._text_element
+        builder.start("device", {"xmlns": "urn:schemas-upnp-org:device-1-0"})
+        text_element(builder, "deviceType", device.device_type)
+        text_element(builder, "friendlyName", device.friendly_name)
+        text_element(builder, "manufacturer", device.manufacturer)
+        text_element(builder, "manufacturerURL", device.manufacturer_url)
+        text_element(builder, "modelDescription", device.model_description)
+        text_element(builder, "modelName", device.model_name)
+        text_element(builder, "modelNumber", device.model_number)
+        text_element(builder, "modelURL", device.model_url)
+        text_element(builder, "serialNumber", device.serial_number)
+        text_element(builder, "UDN", device.udn)
+        text_element(builder, "UPC", device.upc)
+        text_element(builder, "presentationURL", device.presentation_url)
+
+        builder.start("iconList", {})
         for icon in device.icons:
-            icon_el = ET.SubElement(icon_list_el, "icon")
-            ET.SubElement(icon_el, "mimetype").text = icon.mimetype
-            ET.SubElement(icon_el, "width").text = str(icon.width)
-            ET.SubElement(icon_el, "height").text = str(icon.height)
-            ET.SubElement(icon_el, "depth").text = str(icon.depth)
-            ET.SubElement(icon_el, "url").text = icon.url
-
-        service_list_el = ET.SubElement(device_el, "serviceList")
+            builder.start("icon", {})
+            text_element(builder, "mimetype", icon.mimetype)
+            text_element(builder, "width", str(icon.width))
+            text_element(builder, "height", str(icon.height))
+            text_element(builder, "depth", str(icon.depth))
+            text_element(builder, "url", icon.url)
+            builder.end("icon")
+        builder.end("iconList")
+
+        builder.start("serviceList", {})
         for service in device.services.values():
-            service_el = ET.SubElement(service_list_el, "service")
-            ET.SubElement(service_el, "serviceType").text = service.service_type
-            ET.SubElement(service_el, "serviceId").text = service.service_id
-            ET.SubElement(service_el, "controlURL").text = service.control_url
-            ET.SubElement(service_el, "eventSubURL").text = service.event_sub_url
-            ET.SubElement(service_el, "SCPDURL").text = service.scpd_url
-
-        device_list_el = ET.SubElement(device_el, "deviceList")
+            builder.start("service", {})
+            text_element(builder, "serviceType", service.service_type)
+            text_element(builder, "serviceId", service.service_id)
+            text_element(builder, "controlURL", service.control_url)
+            text_element(builder, "eventSubURL", service.event_sub_url)
+            text_element(builder, "SCPDURL", service.scpd_url)
+            builder.end("service")
+        builder.end("serviceList")
+
+        builder.start("deviceList", {})
         for embedded_device in device.embedded_devices.values():
-            embedded_device_el = cls._device_to_xml_bare(embedded_device)
-            device_list_el.append(embedded_device_el)
+            cls._device_to_xml_bare(builder, embedded_device)
+        builder.end("deviceList")
 
-        return device_el
+        builder.end("device")
 
     @classmethod
     def _service_to_xml(cls, service: UpnpService) -> ET.Element:
         """Convert service to service description XML."""
-        scpd_el = ET.Element("scpd", xmlns="urn:schemas-upnp-org:service-1-0")
-        spec_version_el = ET.SubElement(scpd_el, "specVersion")
-        ET.SubElement(spec_version_el, "major").text = "1"
-        ET.SubElement(spec_version_el, "minor").text = "0"
+        builder = ET.TreeBuilder()
+        builder.start("scpd", {"xmlns": "urn:schemas-upnp-org:service-1-0"})
+        cls._spec_version_to_xml(builder)
 
-        action_list_el = ET.SubElement(scpd_el, "actionList")
+        builder.start("actionList", {})
         for action in service.actions.values():
-            action_el = cls._action_to_xml(action)
-            action_list_el.append(action_el)
+            cls._action_to_xml(builder, action)
+        builder.end("actionList")
 
-        state_table_el = ET.SubElement(scpd_el, "serviceStateTable")
+        builder.start("serviceStateTable", {})
         for state_var in service.state_variables.values():
-            state_var_el = cls._state_variable_to_xml(state_var)
-            state_table_el.append(state_var_el)
+            cls._state_variable_to_xml(builder, state_var)
+        builder.end("serviceStateTable")
 
-        return scpd_el
+        builder.end("scpd")
+        return builder.close()
 
     @classmethod
-    def _action_to_xml(cls, action: UpnpAction) -> ET.Element:
+    def _action_to_xml(cls, builder: ET.TreeBuilder, action: UpnpAction) -> None:
         """Convert action to service description XML."""
-        action_el = ET.Element("action")
-        ET.SubElement(action_el, "name").text = action.name
+        builder.start("action", {})
+        cls._text_element(builder, "name", action.name)
 
         if action.arguments:
-            arg_list_el = ET.SubElement(action_el, "argumentList")
+            builder.start("argumentList", {})
             for arg in action.in_arguments():
-                arg_el = cls._action_argument_to_xml(arg)
-                arg_list_el.append(arg_el)
+                cls._action_argument_to_xml(builder, arg)
             for arg in action.out_arguments():
-                arg_el = cls._action_argument_to_xml(arg)
-                arg_list_el.append(arg_el)
+                cls._action_argument_to_xml(builder, arg)
+            builder.end("argumentList")
 
-        return action_el
+        builder.end("action")
 
     @classmethod
-    def _action_argument_to_xml(cls, argument: UpnpAction.Argument) -> ET.Element:
+    def _action_argument_to_xml(
+        cls, builder: ET.TreeBuilder, argument: UpnpAction.Argument
+    ) -> None:
         """Convert action argument to service description XML."""
-        arg_el = ET.Element("argument")
-        ET.SubElement(arg_el, "name").text = argument.name
-        ET.SubElement(arg_el, "direction").text = argument.direction
-        ET.SubElement(
-            arg_el, "relatedStateVariable"
-        ).text = argument.related_state_variable.name
-        return arg_el
+        builder.start("argument", {})
+        cls._text_element(builder, "name", argument.name)
+        cls._text_element(builder, "direction", argument.direction)
+        cls._text_element(
+            builder, "relatedStateVariable", argument.related_state_variable.name
+        )
+        builder.end("argument")
 
     @classmethod
-    def _state_variable_to_xml(cls, state_variable: UpnpStateVariable) -> ET.Element:
+    def _state_variable_to_xml(
+        cls, builder: ET.TreeBuilder, state_variable: UpnpStateVariable
+    ) -> None:
         """Convert state variable to service description XML."""
-        state_var_el = ET.Element(
-            "stateVariable", sendEvents="yes" if state_variable.send_events else "no"
+        text_element = cls._text_element
+        builder.start(
+            "stateVariable",
+            {"sendEvents": "yes" if state_variable.send_events else "no"},
         )
-        ET.SubElement(state_var_el, "name").text = state_variable.name
-        ET.SubElement(state_var_el, "dataType").text = state_variable.data_type
+        text_element(builder, "name", state_variable.name)
+        text_element(builder, "dataType", state_variable.data_type)
 
         if state_variable.allowed_values:
-            value_list_el = ET.SubElement(state_var_el, "allowedValueList")
+            builder.start("allowedValueList", {})
             for allowed_value in state_variable.allowed_values:
-                ET.SubElement(value_list_el, "allowedValue").text = str(allowed_value)
+                text_element(builder, "allowedValue", str(allowed_value))
+            builder.end("allowedValueList")
 
         if None not in (state_variable.min_value, state_variable.max_value):
-            value_range_el = ET.SubElement(state_var_el, "allowedValueRange")
-            ET.SubElement(value_range_el, "minimum").text = str(
-                state_variable.min_value
-            )
-            ET.SubElement(value_range_el, "maximum").text = str(
-                state_variable.max_value
-            )
+            builder.start("allowedValueRange", {})
+            text_element(builder, "minimum", str(state_variable.min_value))
+            text_element(builder, "maximum", str(state_variable.max_value))
+            builder.end("allowedValueRange")
 
         if state_variable.default_value is not None:
-            ET.SubElement(state_var_el, "defaultValue").text = str(
-                state_variable.default_value
-            )
+            text_element(builder, "defaultValue", str(state_variable.default_value))
 
-        return state_var_el
+        builder.end("stateVariable")
 
 
 def callable_action(
@@ -1055,13 +1225,8 @@ def callable_action(
     """Declare method as a callable UpnpAction."""
 
     def decorator(func: Callable) -> Callable:
-        @wraps(func)
-        def wrapper(*args: Any, **kwargs: Any) -> Any:
-            return func(*args, **kwargs)
-
-        setattr(wrapper, "__upnp_action__", [name, in_args, out_args])
-
-        return wrapper
+        setattr(func, "__upnp_action__", (name, in_args, out_args))
+        return func
 
     return decorator
 
@@ -1074,10 +1239,10 @@ async def _parse_action_body(
     soap_action = request.headers.get("SOAPAction", "").strip('"')
     try:
         _, action_name = soap_action.split("#")
-        data = await request.text()
+        data = await request.read()
         root_el: ET.Element = DET.fromstring(data)
-        body_el = root_el.find("s:Body", NAMESPACES)
-        assert body_el
+        body_el = root_el.find(_SOAP_BODY_TAG)
+        assert body_el is not None
         rpc_el = body_el[0]
     except Exception as exc:
         raise HTTPBadRequest(reason="InvalidSoap") from exc
@@ -1101,55 +1266,35 @@ def _create_action_response(
     service: UpnpServerService, action_name: str, result: Dict[str, Any]
 ) -> Response:
     """Create action call response."""
-    envelope_el = ET.Element(
-        "s:Envelope",
-        attrib={
-            "xmlns:s": NAMESPACES["s"],
-            "s:encodingStyle": NAMESPACES["es"],
-        },
-    )
-    body_el = ET.SubElement(envelope_el, "s:Body")
-
-    response_el = ET.SubElement(
-        body_el, f"st:{action_name}Response", attrib={"xmlns:st": service.service_type}
-    )
+    # Static envelope, only the response element varies. Escaped as ElementTree would.
+    service_type = escape(service.service_type, {'"': "&quot;"})
+    parts = [
+        _SOAP_ENVELOPE_START,
+        f'<st:{action_name}Response xmlns:st="{service_type}">',
+    ]
     out_state_vars = {
         var.name: var.related_state_variable
         for var in service.actions[action_name].out_arguments()
     }
     for key, value in result.items():
         if isinstance(value, UpnpStateVariable):
-            ET.SubElement(response_el, key).text = value.upnp_value
+            text = value.upnp_value
         else:
             template_var = out_state_vars[key]
             template_var.validate_value(value)
-            ET.SubElement(response_el, key).text = template_var.coerce_upnp(value)
-    return Response(
-        content_type="text/xml",
-        charset="utf-8",
-        body=ET.tostring(envelope_el, encoding="utf-8"),
-    )
+            text = template_var.coerce_upnp(value)
+        parts.append(f"<{key}>{escape(text)}</{key}>" if text else f"<{key} />")
+    parts.append(f"</st:{action_name}Response>")
+    parts.append(_SOAP_ENVELOPE_END)
+
+    return Response(body="".join(parts).encode(), headers=_XML_HEADERS)
 
 
 def _create_error_action_response(
     exception: UpnpError,
 ) -> Response:
     """Create action call response."""
-    envelope_el = ET.Element(
-        "s:Envelope",
-        attrib={
-            "xmlns:s": NAMESPACES["s"],
-            "s:encodingStyle": NAMESPACES["es"],
-        },
-    )
-    body_el = ET.SubElement(envelope_el, "s:Body")
-    fault_el = ET.SubElement(body_el, "s:Fault")
-    ET.SubElement(fault_el, "faultcode").text = "s:Client"
-    ET.SubElement(fault_el, "faultstring").text = "UPnPError"
-    detail_el = ET.SubElement(fault_el, "detail")
-    error_el = ET.SubElement(
-        detail_el, "UPnPError", xmlns="urn:schemas-upnp-org:control-1-0"
-    )
+    # Static fault envelope, only the error code varies.
     error_code = (
         exception.error_code or UpnpActionErrorCode.ACTION_FAILED.value
         if isinstance(exception, UpnpActionError)
@@ -1157,14 +1302,11 @@ def _create_error_action_response(
         if isinstance(exception, UpnpValueError)
         else 501
     )
-    ET.SubElement(error_el, "errorCode").text = str(error_code)
-    ET.SubElement(error_el, "errorDescription").text = "Action Failed"
 
     return Response(
         status=500,
-        content_type="text/xml",
-        charset="utf-8",
-        body=ET.tostring(envelope_el, encoding="utf-8"),
+        body=_SOAP_FAULT_START + str(error_code).encode() + _SOAP_FAULT_END,
+        headers=_XML_HEADERS,
     )
 
 
@@ -1237,15 +1379,46 @@ async def unsubscribe_handler(service: UpnpServerService, request: Request) -> R
     return Response(status=412)
 
 
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """Test if gzip is an acceptable content-coding, honouring q=0."""
+    qualities: Dict[str, float] = {}
+    for coding in accept_encoding.lower().split(","):
+        name, *params = coding.split(";")
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name.strip()] = quality
+
+    return qualities.get("gzip", qualities.get("*", 0.0)) > 0
+
+
 async def to_xml(
-    thing: Union[UpnpServerDevice, UpnpServerService], _request: Request
+    thing: Union[UpnpServerDevice, UpnpServerService], request: Request
 ) -> Response:
     """Construct device/service description."""
-    serializer = UpnpXmlSerializer()
-    thing_el = serializer.to_xml(thing)
-    encoding = "utf-8"
-    thing_xml = ET.tostring(thing_el, encoding=encoding)
-    return Response(content_type="text/xml", charset=encoding, body=thing_xml)
+    gzipped = _accepts_gzip(request.headers.get("ACCEPT-ENCODING", ""))
+    thing_xml, etag = UpnpXmlSerializer.to_xml_bytes_etag(thing, gzipped)
+    headers = {
+        "ETAG": f'"{etag}"',
+        "CACHE-CONTROL": HEADER_CACHE_CONTROL,
+        "VARY": "Accept-Encoding",
+    }
+
+    # Control points tend to poll the descriptions, answer those which
+    # already have the current description without a body.
+    if_none_match = request.if_none_match
+    if if_none_match and any(tag.value in (etag, "*") for tag in if_none_match):
+        return Response(status=304, headers=headers)
+
+    headers["CONTENT-TYPE"] = _XML_CONTENT_TYPE
+    if gzipped:
+        headers["CONTENT-ENCODING"] = "gzip"
+    return Response(body=thing_xml, headers=headers)
 
 
 def create_state_var(
@@ -1313,7 +1486,19 @@ class UpnpServer:
         self.config_id = config_id
         self.options = options or {}
 
-        self.base_uri: Optional[str] = None
+        self._address_family = (
+            socket.AF_INET6 if ":" in self.source[0] else socket.AF_INET
+        )
+        self._http_host: str = (
+            f"{self.source[0]}%{self.source[3]}"  # type: ignore
+            if self._address_family == socket.AF_INET6
+            else self.source[0]
+        )
+        self.base_uri = (
+            f"http://[{self.source[0]}]:{self.http_port}"
+            if self._address_family == socket.AF_INET6
+            else f"http://{self.source[0]}:{self.http_port}"
+        )
         self._device: Optional[UpnpServerDevice] = None
         self._site: Optional[TCPSite] = None
         self._search_responder: Optional[SsdpSearchResponder] = None
@@ -1328,12 +1513,6 @@ class UpnpServer:
     def _create_device(self) -> None:
         """Create device."""
         requester = AiohttpRequester()
-        is_ipv6 = ":" in self.source[0]
-        self.base_uri = (
-            f"http://[{self.source[0]}]:{self.http_port}"
-            if is_ipv6
-            else f"http://{self.source[0]}:{self.http_port}"
-        )
         self._device = self.server_device(
             requester, self.base_uri, self.boot_id, self.config_id
         )
@@ -1342,27 +1521,27 @@ class UpnpServer:
         """Start http server."""
         assert self._device
 
-        # Build app.
+        # Build app. Descriptions are serialized now, instead of on the first request.
         app = Application()
+        UpnpXmlSerializer.to_xml_bytes(self._device)
         app.router.add_get(self._device.device_url, partial(to_xml, self._device))
 
-        for service in self._device.all_services:
-            service = cast(UpnpServerService, service)
-            app.router.add_get(
-                service.SERVICE_DEFINITION.scpd_url, partial(to_xml, service)
-            )
+        services = cast(Sequence[UpnpServerService], self._device.all_services)
+        for service in services:
+            UpnpXmlSerializer.to_xml_bytes(service)
+            service_definition = service.SERVICE_DEFINITION
+            app.router.add_get(service_definition.scpd_url, partial(to_xml, service))
             app.router.add_post(
-                service.SERVICE_DEFINITION.control_url, partial(action_handler, service)
+                service_definition.control_url, partial(action_handler, service)
+            )
+            event_sub_resource = app.router.add_resource(
+                service_definition.event_sub_url
             )
-            app.router.add_route(
-                "SUBSCRIBE",
-                service.SERVICE_DEFINITION.event_sub_url,
-                partial(subscribe_handler, service),
+            event_sub_resource.add_route(
+                "SUBSCRIBE", partial(subscribe_handler, service)
             )
-            app.router.add_route(
-                "UNSUBSCRIBE",
-                service.SERVICE_DEFINITION.event_sub_url,
-                partial(unsubscribe_handler, service),
+            event_sub_resource.add_route(
+                "UNSUBSCRIBE", partial(unsubscribe_handler, service)
             )
 
         if self._device.ROUTES:
@@ -1373,9 +1552,9 @@ class UpnpServer:
         await runner.setup()
 
         # Launch TCP handler.
-        is_ipv6 = ":" in self.source[0]
-        host = f"{self.source[0]}%{self.source[3]}" if is_ipv6 else self.source[0]  # type: ignore
-        self._site = TCPSite(runner, host, self.http_port, reuse_address=True)
+        self._site = TCPSite(
+            runner, self._http_host, self.http_port, reuse_address=True
+        )
         await self._site.start()
 
         assert self._device
@@ -1402,11 +1581,14 @@ class UpnpServer:
             options=self.options.get(SSDP_ADVERTISEMENT_ANNOUNCER_OPTIONS),
         )
 
+        # Started one after the other, the announcer is not started when the
+        # search responder fails to start.
         await self._search_responder.async_start()
         await self._advertisement_announcer.async_start()
 
     async def async_stop(self) -> None:
         """Stop server."""
+        # Send the byebyes while the HTTP server is still up.
         await self._async_stop_ssdp()
         await self._async_stop_http_server()
 
@@ -1421,3 +1603,8 @@ class UpnpServer:
         """Stop HTTP server."""
         if self._site:
             await self._site.stop()
+
+        if self._device:
+            UpnpXmlSerializer.clear_cache(self._device)
+            for service in self._device.all_services:
+                UpnpXmlSerializer.clear_cache(service)
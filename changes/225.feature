@@ -0,0 +1 @@
+Server answers conditional device/service description requests with 304 Not Modified, based on an ETag, and serves gzip compressed descriptions to clients accepting them. UpnpServer.base_uri is set on construction, instead of being None until the server is started
@@ -11,6 +11,7 @@ from typing import (
     Awaitable,
     Callable,
     Dict,
+    List,
     Optional,
     Tuple,
 )
@@ -24,7 +25,10 @@ import async_upnp_client.client
 import async_upnp_client.server
 from async_upnp_client.client import UpnpStateVariable
 from async_upnp_client.const import DeviceInfo, ServiceInfo
+from async_upnp_client.exceptions import UpnpActionError
 from async_upnp_client.server import (
+    SSDP_SEARCH_RESPONDER_OPTION_ALWAYS_REPLY_WITH_ROOT_DEVICE,
+    SsdpSearchResponder,
     UpnpServer,
     UpnpServerDevice,
     UpnpServerService,
@@ -32,8 +36,9 @@ from async_upnp_client.server import (
     create_event_var,
     create_state_var,
 )
+from async_upnp_client.utils import CaseInsensitiveDict
 
-from .conftest import read_file
+from .conftest import UpnpTestRequester, read_file
 
 
 class ServerServiceTest(UpnpServerService):
@@ -229,6 +234,8 @@ async def test_init(upnp_server: Any) -> None:
     http_client = upnp_server.http_client
     resp = await http_client.get("/device.xml")
     assert resp.status == 200
+    assert resp.content_type == "text/xml"
+    assert resp.charset == "utf-8"
     data = await resp.text()
     assert data == read_file("server/device.xml").strip()
 
@@ -248,10 +255,91 @@ async def test_action(upnp_server: Any) -> None:
         },
     )
     assert resp.status == 200
+    assert resp.content_type == "text/xml"
+    assert resp.charset == "utf-8"
     data = await resp.text()
     assert data == read_file("server/action_response.xml").strip()
 
 
+@pytest.mark.asyncio
+async def test_action_error(upnp_server: Any, monkeypatch: Any) -> None:
+    """Test action execution failing."""
+    # pylint: disable=redefined-outer-name
+
+    async def raise_error(*_args: Any, **_kwargs: Any) -> None:
+        raise UpnpActionError(error_code=714)
+
+    service = upnp_server.server._device.service(  # pylint: disable=protected-access
+        "urn:schemas-upnp-org:service:TestServerService:1"
+    )
+    monkeypatch.setattr(service, "async_handle_action", raise_error)
+    http_client = upnp_server.http_client
+    resp = await http_client.post(
+        "/upnp/control/TestServerService",
+        data=read_file("server/action_request.xml"),
+        headers={
+            "content-type": 'text/xml; charset="utf-8"',
+            "user-agent": "Linux/1.0 UPnP/1.1 test/1.0",
+            "soapaction": "urn:schemas-upnp-org:service:TestServerService:1#SetValues",
+        },
+    )
+    assert resp.status == 500
+    assert resp.content_type == "text/xml"
+    data = await resp.text()
+    assert data == read_file("server/action_error_response.xml").strip()
+
+
+class ActionMixin:
+    """Mixin providing an action."""
+
+    # pylint: disable=too-few-public-methods
+
+    @callable_action(name="FromMixin", in_args={}, out_args={})
+    async def from_mixin(self) -> Dict[str, UpnpStateVariable]:
+        """Handle action."""
+        return {}
+
+
+class ServerServiceBaseA(UpnpServerService):
+    """Test Service base."""
+
+    @callable_action(name="FromA", in_args={}, out_args={})
+    async def from_a(self) -> Dict[str, UpnpStateVariable]:
+        """Handle action."""
+        return {}
+
+    @callable_action(name="Overridden", in_args={}, out_args={})
+    async def overridden(self) -> Dict[str, UpnpStateVariable]:
+        """Handle action."""
+        return {}
+
+
+class ServerServiceBaseB(UpnpServerService):
+    """Test Service base."""
+
+    @callable_action(name="FromB", in_args={}, out_args={})
+    async def from_b(self) -> Dict[str, UpnpStateVariable]:
+        """Handle action."""
+        return {}
+
+
+class ServerServiceCombined(ActionMixin, ServerServiceBaseA, ServerServiceBaseB):
+    """Test Service combining actions from several bases."""
+
+    SERVICE_DEFINITION = ServerServiceTest.SERVICE_DEFINITION
+    STATE_VARIABLE_DEFINITIONS: Dict[str, Any] = {}
+
+    async def overridden(self) -> Dict[str, UpnpStateVariable]:
+        """Override action with a plain method."""
+        return {}
+
+
+def test_service_inherited_actions() -> None:
+    """Test actions from mixins and multiple bases are registered."""
+    service = ServerServiceCombined(UpnpTestRequester({}))
+    assert sorted(service.actions) == ["FromA", "FromB", "FromMixin"]
+
+
 @pytest.mark.asyncio
 async def test_subscribe(upnp_server: Any) -> None:
     """Test subcsription to server event."""
@@ -297,3 +385,245 @@ async def test_subscribe(upnp_server: Any) -> None:
     with suppress(asyncio.TimeoutError):
         await asyncio.wait_for(event.wait(), 2)
     assert event.is_set()
+
+
+@pytest.mark.asyncio
+async def test_init_not_modified(upnp_server: Any) -> None:
+    """Test conditional device query."""
+    # pylint: disable=redefined-outer-name
+    http_client = upnp_server.http_client
+    resp = await http_client.get("/device.xml")
+    assert resp.status == 200
+    etag = resp.headers.get("ETag")
+    assert etag
+
+    resp = await http_client.get("/device.xml", headers={"If-None-Match": etag})
+    assert resp.status == 304
+    assert resp.headers.get("ETag") == etag
+    assert not await resp.read()
+
+
+@pytest.mark.asyncio
+async def test_init_gzip(upnp_server: Any) -> None:
+    """Test device query, with and without gzip content-encoding."""
+    # pylint: disable=redefined-outer-name
+    http_client = upnp_server.http_client
+    resp = await http_client.get("/device.xml", headers={"Accept-Encoding": "gzip"})
+    assert resp.status == 200
+    assert resp.headers.get("Content-Encoding") == "gzip"
+    data = await resp.text()
+    assert data == read_file("server/device.xml").strip()
+
+    for accept_encoding in ("identity", "gzip;q=0", "gzip;q=0, *", "*;q=0"):
+        resp = await http_client.get(
+            "/device.xml", headers={"Accept-Encoding": accept_encoding}
+        )
+        assert resp.status == 200
+        assert "Content-Encoding" not in resp.headers
+        data = await resp.text()
+        assert data == read_file("server/device.xml").strip()
+
+    resp = await http_client.get("/device.xml", headers={"Accept-Encoding": "*"})
+    assert resp.status == 200
+    assert resp.headers.get("Content-Encoding") == "gzip"
+
+
+class ServerServiceVersioned(UpnpServerService):
+    """Test Service with a newer version."""
+
+    SERVICE_DEFINITION = ServiceInfo(
+        service_id="urn:upnp-org:serviceId:TestVersionedService",
+        service_type="urn:schemas-upnp-org:service:TestVersionedService:2",
+        control_url="/upnp/control/TestVersionedService",
+        event_sub_url="/upnp/event/TestVersionedService",
+        scpd_url="/TestVersionedService.xml",
+        xml=ET.Element("server_service"),
+    )
+    STATE_VARIABLE_DEFINITIONS: Dict[str, Any] = {}
+
+
+class ServerServiceUnversioned(UpnpServerService):
+    """Test Service with a non-numeric version."""
+
+    SERVICE_DEFINITION = ServiceInfo(
+        service_id="urn:upnp-org:serviceId:TestUnversionedService",
+        service_type="urn:schemas-upnp-org:service:TestUnversionedService:beta",
+        control_url="/upnp/control/TestUnversionedService",
+        event_sub_url="/upnp/event/TestUnversionedService",
+        scpd_url="/TestUnversionedService.xml",
+        xml=ET.Element("server_service"),
+    )
+    STATE_VARIABLE_DEFINITIONS: Dict[str, Any] = {}
+
+
+class EmbeddedDeviceTest(UpnpServerDevice):
+    """Test embedded device."""
+
+    DEVICE_DEFINITION = DeviceInfo(
+        device_type="urn:schemas-upnp-org:device:TestEmbeddedDevice:2",
+        friendly_name="Test Embedded",
+        manufacturer="Test",
+        manufacturer_url=None,
+        model_name="TestEmbedded",
+        model_url=None,
+        udn="uuid:0fd4d1d6-3dd0-4b4e-a0c4-97b4d2b8a1f1",
+        upc=None,
+        model_description="Test Embedded",
+        model_number="v0.0.1",
+        serial_number="0000002",
+        presentation_url=None,
+        url="/embedded.xml",
+        icons=[],
+        xml=ET.Element("server_device"),
+    )
+    EMBEDDED_DEVICES = []
+    SERVICES = [ServerServiceVersioned]
+
+
+class SearchDeviceTest(UpnpServerDevice):
+    """Test device with an embedded device."""
+
+    DEVICE_DEFINITION = ServerDeviceTest.DEVICE_DEFINITION._replace(
+        device_type="urn:schemas-upnp-org:device:TestServerDevice:1",
+    )
+    EMBEDDED_DEVICES = [EmbeddedDeviceTest]
+    SERVICES = [ServerServiceUnversioned]
+
+
+ROOT_UDN = "uuid:adca2e25-cbe4-427a-a5c3-9b5931e7b79b"
+EMBEDDED_UDN = "uuid:0fd4d1d6-3dd0-4b4e-a0c4-97b4d2b8a1f1"
+
+
+def _parse_search_response(packet: bytes) -> Tuple[str, str]:
+    """Check a search response packet, return its ST and USN."""
+    assert packet.startswith(b"HTTP/1.1 200 OK\r\n")
+    assert packet.endswith(b"\r\n\r\n")
+    lines = packet.decode().split("\r\n")[1:-2]
+    headers = dict(line.split(":", 1) for line in lines)
+    assert len(headers) == len(lines)
+    assert len([line for line in lines if line.startswith("DATE:")]) == 1
+    assert headers["LOCATION"] == "http://192.168.1.2:8000/device.xml"
+    assert headers["CACHE-CONTROL"] == "max-age=1800"
+    assert headers["BOOTID.UPNP.ORG"] == "1"
+    assert headers["CONFIGID.UPNP.ORG"] == "1"
+    return headers["ST"], headers["USN"]
+
+
+def _search_responder(options: Optional[Dict[str, Any]] = None) -> SsdpSearchResponder:
+    """Create a search responder for SearchDeviceTest."""
+    device = SearchDeviceTest(UpnpTestRequester({}), "http://192.168.1.2:8000")
+    return SsdpSearchResponder(
+        device,
+        source=("192.168.1.2", 0),
+        target=("239.255.255.250", 1900),
+        options=options,
+    )
+
+
+def _search(
+    responder: SsdpSearchResponder, search_target: str
+) -> List[Tuple[str, str]]:
+    """Build the responses for a search, as (ST, USN) pairs."""
+    # pylint: disable=protected-access
+    responses = responder._build_responses(CaseInsensitiveDict(ST=search_target))
+    return [_parse_search_response(response) for response in responses]
+
+
+@pytest.mark.asyncio
+async def test_search_responses_all(monkeypatch: Any) -> None:
+    """Test responses to a ssdp:all search."""
+    responder = _search_responder()
+    assert _search(responder, "ssdp:all") == [
+        ("upnp:rootdevice", f"{ROOT_UDN}::upnp:rootdevice"),
+        (ROOT_UDN, ROOT_UDN),
+        (EMBEDDED_UDN, ROOT_UDN),
+        (
+            "urn:schemas-upnp-org:device:TestServerDevice:1",
+            f"{ROOT_UDN}::urn:schemas-upnp-org:device:TestServerDevice:1",
+        ),
+        (
+            "urn:schemas-upnp-org:device:TestEmbeddedDevice:2",
+            f"{ROOT_UDN}::urn:schemas-upnp-org:device:TestEmbeddedDevice:2",
+        ),
+        (
+            "urn:schemas-upnp-org:service:TestUnversionedService:beta",
+            f"{ROOT_UDN}::urn:schemas-upnp-org:service:TestUnversionedService:beta",
+        ),
+        (
+            "urn:schemas-upnp-org:service:TestVersionedService:2",
+            f"{ROOT_UDN}::urn:schemas-upnp-org:service:TestVersionedService:2",
+        ),
+    ]
+
+    # Packets are cached, but get a fresh DATE header, shared by all packets.
+    # pylint: disable=protected-access
+    dates = iter(["Thu, 01 Jan 1970 00:00:01 GMT", "Thu, 01 Jan 1970 00:00:02 GMT"])
+    monkeypatch.setattr(
+        async_upnp_client.server, "format_date_time", lambda _: next(dates)
+    )
+    headers = CaseInsensitiveDict(ST="ssdp:all")
+    for date in ("Thu, 01 Jan 1970 00:00:01 GMT", "Thu, 01 Jan 1970 00:00:02 GMT"):
+        responses = responder._build_responses(headers)
+        assert len(responses) == 7
+        assert all(
+            response.endswith(f"\r\nDATE:{date}\r\n\r\n".encode())
+            for response in responses
+        )
+
+
+@pytest.mark.asyncio
+async def test_search_responses_rootdevice_udn() -> None:
+    """Test responses to rootdevice and UDN searches."""
+    responder = _search_responder()
+    assert _search(responder, "upnp:rootdevice") == [
+        ("upnp:rootdevice", f"{ROOT_UDN}::upnp:rootdevice")
+    ]
+    assert _search(responder, ROOT_UDN) == [(ROOT_UDN, ROOT_UDN)]
+    assert _search(responder, EMBEDDED_UDN.upper()) == [(EMBEDDED_UDN, ROOT_UDN)]
+    assert not _search(responder, "uuid:00000000-0000-0000-0000-000000000000")
+
+
+@pytest.mark.asyncio
+async def test_search_responses_type_versions() -> None:
+    """Test responses to device/service type searches, for several versions."""
+    responder = _search_responder()
+    # The ST header echoes the (lower cased) search target.
+    device_type = "urn:schemas-upnp-org:device:TestEmbeddedDevice"
+    device_usn = f"{ROOT_UDN}::{device_type}:2"
+    assert _search(responder, f"{device_type}:1") == [
+        (f"{device_type}:1".lower(), device_usn)
+    ]
+    assert _search(responder, f"{device_type}:2") == [
+        (f"{device_type}:2".lower(), device_usn)
+    ]
+    assert not _search(responder, f"{device_type}:3")
+
+    service_type = "urn:schemas-upnp-org:service:TestVersionedService"
+    service_usn = f"{ROOT_UDN}::{service_type}:2"
+    assert _search(responder, f"{service_type}:1") == [
+        (f"{service_type}:1".lower(), service_usn)
+    ]
+    assert _search(responder, f"{service_type}:2") == [
+        (f"{service_type}:2".lower(), service_usn)
+    ]
+    assert not _search(responder, f"{service_type}:3")
+
+    # Non-numeric versions only match exactly.
+    service_type = "urn:schemas-upnp-org:service:TestUnversionedService"
+    service_usn = f"{ROOT_UDN}::{service_type}:beta"
+    assert _search(responder, f"{service_type}:beta") == [
+        (f"{service_type}:beta".lower(), service_usn)
+    ]
+    assert not _search(responder, f"{service_type}:alpha")
+    assert not _search(responder, f"{service_type}:1")
+
+
+@pytest.mark.asyncio
+async def test_search_responses_always_reply_with_root_device() -> None:
+    """Test the option to always reply with the root device."""
+    responder = _search_responder(
+        {SSDP_SEARCH_RESPONDER_OPTION_ALWAYS_REPLY_WITH_ROOT_DEVICE: True}
+    )
+    assert _search(responder, "urn:schemas-upnp-org:device:Unknown:1") == [
+        ("upnp:rootdevice", f"{ROOT_UDN}::upnp:rootdevice")
+    ]